@@ -1,17 +1,79 @@
 import os
+import re
 import string
-import matplotlib.pyplot as plt
+import sys
+import numpy as np
 import datetime
-from selenium import webdriver
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+import requests
 from googleapiclient.discovery import build
-from nltk.corpus import stopwords
 
 
 _api_key = os.environ.get('YT_API_KEY')
-_web_browser = 'chrome'
+_trending_url = 'https://www.youtube.com/feed/trending'
+_video_id_re = re.compile(r'"videoId":"([\w-]{11})"')
 _web_driver = r'C:\Program Files (x86)\chromedriver.exe'
 
 
+@lru_cache(maxsize=None)
+def _stopwords(custom):
+    """ Builds the set of stop words the first time it is needed so that removing them is a set lookup.
+
+    :param custom: (bool) Includes some custom strings within the stop words if True.
+    :return: (frozenset(str)) The stop words.
+    """
+
+    if custom:
+        return _stopwords(False) | frozenset('0123456789') | frozenset(string.punctuation) | \
+               frozenset(['-', '+', '*', '/', '.', '(', ')', '&', '|']) | \
+               frozenset(['video', 'youtube', 'new', 'get', 'ft'])
+
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        return frozenset(stopwords.words('english'))
+    except LookupError:
+        # The stopwords corpus has not been downloaded yet
+        nltk.download('stopwords', quiet=True)
+        return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=2048)
+def _split_title(title):
+    """ Splits a title into its unique individual words with the surrounding punctuation removed.
+
+    :param title: (str) The title to be split.
+    :return: (tuple(str)) The unique words within the title.
+    """
+
+    # dict.fromkeys keeps the first occurrence of every word so the order matches the title
+    words = (sys.intern(w.strip(string.punctuation)) for w in title.split())
+    return tuple(dict.fromkeys(word for word in words if word != ''))
+
+
+@lru_cache(maxsize=4096)
+def _split_tag(tag):
+    """ Splits a tag into its individual words.
+
+    :param tag: (str) The tag to be split.
+    :return: (tuple(str)) The words within the tag.
+    """
+
+    return tuple(map(sys.intern, tag.split()))
+
+
+@lru_cache(maxsize=1)
+def _youtube_service():
+    """ Builds the YouTube API service once from the discovery document bundled with googleapiclient.
+
+    :return: (googleapiclient.discovery.Resource) The YouTube API service.
+    """
+
+    return build('youtube', 'v3', developerKey=_api_key, cache_discovery=False, static_discovery=True)
+
+
 class Video:
     """ A YouTube video object.
 
@@ -23,7 +85,7 @@ class Video:
         view_count: (int) Amount of views on the video (default is 0).
         likes: (int) Amount of likes on the video (default is 0).
         dislikes: (int) Amount of dislikes on the video (default is 0).
-        like_ratio: (float) The like to dislike ratio (likes/dislikes).
+        like_ratio: (float) The like to dislike ratio (likes/dislikes); None if the video has no dislikes.
         comment_count: (int) Amount of comments on the video (default is 0).
         made_for_kids: (bool) If the video is designated as child-directed (default is None).
 
@@ -35,6 +97,9 @@ class Video:
         stop_tags: Removes some commonly used / unimportant words from the tags. Best used after splitting self.tags.
     """
 
+    __slots__ = ('_id', '_title', '_tags', '_duration', '_view_count', '_likes', '_dislikes', '_comment_count',
+                 '_made_for_kids')
+
     def __init__(self, id, title='', tags=None, duration='', view_count=0, likes=0, dislikes=0, comment_count=0,
                  made_for_kids=None):
         """
@@ -53,10 +118,10 @@ class Video:
         self._title = title
         self._tags = tags
         self._duration = duration
-        self._view_count = view_count
-        self._likes = likes
-        self._dislikes = dislikes
-        self._comment_count = comment_count
+        self._view_count = int(view_count)
+        self._likes = int(likes)
+        self._dislikes = int(dislikes)
+        self._comment_count = int(comment_count)
         self._made_for_kids = made_for_kids
 
     def __repr__(self):
@@ -86,23 +151,25 @@ class Video:
 
     @property
     def view_count(self):
-        return int(self._view_count)
+        return self._view_count
 
     @property
     def likes(self):
-        return int(self._likes)
+        return self._likes
 
     @property
     def dislikes(self):
-        return int(self._dislikes)
+        return self._dislikes
 
     @property
     def like_ratio(self):
-        return round(self.likes/self.dislikes, 2)
+        if self._dislikes == 0:
+            return None
+        return round(self._likes/self._dislikes, 2)
 
     @property
     def comment_count(self):
-        return int(self._comment_count)
+        return self._comment_count
 
     @property
     def made_for_kids(self):
@@ -117,19 +184,19 @@ class Video:
                  'statistics(viewCount, likeCount, dislikeCount, commentCount), ' \
                  'status(madeForKids))'
 
-        youtube = build('youtube', 'v3', developerKey=_api_key).videos()
-        items = youtube.list(part=part, fields=fields, id=id).execute()['items'][0]
+        youtube = _youtube_service().videos()
+        items = youtube.list(part=part, fields=fields, id=self._id).execute()['items'][0]
         snippet = items['snippet']
         statistics = items['statistics']
         self._title = snippet['title']
         if 'tags' in snippet:
-            self._tags = list(set(tag.lower() for tag in snippet['tags']))
+            self._tags = list({sys.intern(tag.lower()) for tag in snippet['tags']})
         self._duration = items['contentDetails']['duration']
-        self._view_count = statistics['viewCount']
-        self._likes = statistics['likeCount']
-        self._dislikes = statistics['dislikeCount']
+        self._view_count = int(statistics['viewCount'])
+        self._likes = int(statistics['likeCount'])
+        self._dislikes = int(statistics['dislikeCount'])
         if 'commentCount' in statistics:
-            self._comment_count = statistics['commentCount']
+            self._comment_count = int(statistics['commentCount'])
         self._made_for_kids = items['status']['madeForKids']
 
     def split_title(self, combine=False):
@@ -138,17 +205,7 @@ class Video:
         :param combine: (bool) Includes the original title string within the self.title list (default is False).
         """
 
-        t = []
-        for title in self._title.split():
-            if (title[0] in string.punctuation) and (title[-1] in string.punctuation):
-                title = title[1:-1]
-            elif (title[0] in string.punctuation) and not (title[-1] in string.punctuation):
-                title = title[1:]
-            elif not (title[0] in string.punctuation) and (title[-1] in string.punctuation):
-                title = title[:-1]
-            if title != '':
-                t.append(title)
-        t = list(set(t))
+        t = list(_split_title(self._title))
 
         if combine:
             self._title = [self._title]
@@ -165,7 +222,7 @@ class Video:
         """
 
         if self._tags:
-            t = list(set([t for tag in self._tags for t in tag.split()]))
+            t = list({t for tag in self._tags for t in _split_tag(tag)})
             if combine:
                 self._tags.extend(t)
             else:
@@ -182,12 +239,7 @@ class Video:
         :return: (list(str)) Returns the updated list of words.
         """
 
-        ignore = list(set(stopwords.words('english')))
-        if custom:
-            ignore.extend(['0', '1', '2', '3', '4', '5', '6', '7', '8', '9'])
-            ignore.extend(string.punctuation)
-            ignore.extend(['-', '+', '*', '/', '.', '(', ')', '&', '|'])
-            ignore.extend(['video', 'youtube', 'new', 'get', 'ft'])
+        ignore = _stopwords(custom)
         return [w for w in words if w.lower() not in ignore]
 
     def stop_title(self):
@@ -266,30 +318,26 @@ class Trending:
     def date(self):
         return self._date
 
-    def get_videos(self, web_browser=_web_browser, web_driver=_web_driver):
+    def get_videos(self, web_browser=None, web_driver=_web_driver):
         """ Finds all the YouTube video within the trending page.
 
-        :param web_browser: (str) The desired web browser to use (default is global variable: _web_browser).
+        :param web_browser: (str) If 'chrome' or 'firefox', loads the trending page within that headless browser
+        instead of reading the raw page; Requires selenium >= 4 (default is None).
         :param web_driver: (str) The path to your web driver (default is global variable: _web_driver).
+        :raises RuntimeError: If no video IDs could be found on the trending page.
         """
 
-        browser_dict = {'chrome': (webdriver.Chrome, webdriver.ChromeOptions),
-                        'firefox': (webdriver.Firefox, webdriver.FirefoxOptions)}
-
-        # Open the browser in headless mode
-        options = browser_dict[web_browser][1]()
-        options.headless = True
-        with browser_dict[web_browser.lower()][0](executable_path=web_driver, options=options) as driver:
-            # Go to the YouTube Trending page
-            driver.get('https://www.youtube.com/feed/trending')
-
-            # Find the video IDs
+        if web_browser:
+            ids = self.__browser_ids(web_browser, web_driver)
+        else:
+            # The video IDs are embedded within the ytInitialData JSON of the raw trending page
+            response = requests.get(_trending_url, headers={'Accept-Language': 'en'}, timeout=10)
+            response.raise_for_status()
             self._date = datetime.datetime.utcnow()
-            ids = []
-            for i in driver.find_elements_by_id('thumbnail'):
-                url = i.get_attribute('href')
-                if url:
-                    ids.append(url[url.index('=') + 1:])
+            ids = list(dict.fromkeys(_video_id_re.findall(response.text)))
+        if not ids:
+            raise RuntimeError("No video IDs were found on the trending page; YouTube may have served a consent "
+                               "page or changed its layout.")
 
         # Requests the videos from the Trending page using the least amount of requests
         _part = ['snippet', 'contentDetails', 'statistics', 'status', 'id']
@@ -298,36 +346,78 @@ class Trending:
                   'statistics(viewCount, likeCount, dislikeCount, commentCount), ' \
                   'status(madeForKids), ' \
                   'id)'
-        youtube = build('youtube', 'v3', developerKey=_api_key).videos()
-        count, num, amount = 0, 50, len(ids)
-        finished = False
-        while not finished:
-            x = count + num
-            if x < amount:
-                id_list = ids[count: x]
-                count += num
+        # Every chunk of 50 IDs is sent within a single batched HTTP request
+        youtube = _youtube_service()
+        videos = youtube.videos()
+        batch = youtube.new_batch_http_request()
+        for id_list in (ids[i: i + 50] for i in range(0, len(ids), 50)):
+            batch.add(videos.list(part=_part, fields=_fields, id=id_list), callback=self._collect_videos)
+        batch.execute()
+
+    def __browser_ids(self, web_browser, web_driver):
+        """ Finds the video IDs of the trending page by loading it within a headless web browser.
+
+        :param web_browser: (str) The desired web browser to use; Either 'chrome' or 'firefox'.
+        :param web_driver: (str) The path to your web driver.
+        :return: (list(str)) The video IDs in the order they appear on the trending page.
+        :raises selenium.common.exceptions.TimeoutException: If no thumbnail appears on the page within 5 seconds.
+        """
+
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        from selenium.webdriver.support import expected_conditions
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        browser_dict = {'chrome': (webdriver.Chrome, webdriver.ChromeOptions, ChromeService),
+                        'firefox': (webdriver.Firefox, webdriver.FirefoxOptions, FirefoxService)}
+        browser, browser_options, service = browser_dict[web_browser.lower()]
+
+        # Open the browser in headless mode
+        options = browser_options()
+        options.add_argument('--headless')
+        with browser(service=service(web_driver), options=options) as driver:
+            # Go to the YouTube Trending page
+            driver.get(_trending_url)
+            WebDriverWait(driver, 5).until(expected_conditions.presence_of_element_located((By.ID, 'thumbnail')))
+
+            # Read every thumbnail link within a single round-trip to the browser
+            self._date = datetime.datetime.utcnow()
+            hrefs = driver.execute_script("return Array.from(document.querySelectorAll('a#thumbnail'))"
+                                          ".map(a => a.href).filter(Boolean)")
+
+        return list(dict.fromkeys(href.split('=', 1)[1].split('&', 1)[0] for href in hrefs if '=' in href))
+
+    def _collect_videos(self, request_id, response, exception):
+        """ Batch request callback that creates a Video object for each video within the response.
+
+        :param request_id: (str) The ID of the request within the batch.
+        :param response: (dict) The deserialized response of the request.
+        :param exception: (googleapiclient.errors.HttpError) The error raised by the request, otherwise None.
+        """
+
+        if exception is not None:
+            raise exception
+
+        for video in response['items']:
+            kwargs = {'id': video['id'], 'title': video['snippet']['title'],
+                      'duration': video['contentDetails']['duration'],
+                      'made_for_kids': video['status']['madeForKids'],
+                      'view_count': int(video['statistics']['viewCount']),
+                      'likes': int(video['statistics']['likeCount']),
+                      'dislikes': int(video['statistics']['dislikeCount'])}
+
+            if 'tags' in video['snippet']:
+                kwargs['tags'] = list({sys.intern(tag.lower()) for tag in video['snippet']['tags']})
+            else:
+                kwargs['tags'] = []
+            if 'commentCount' in video['statistics']:
+                kwargs['comment_count'] = int(video['statistics']['commentCount'])
             else:
-                id_list = ids[count:]
-                finished = True
-
-            for video in youtube.list(part=_part, fields=_fields, id=id_list).execute()['items']:
-                kwargs = {'id': video['id'], 'title': video['snippet']['title'],
-                          'duration': video['contentDetails']['duration'],
-                          'made_for_kids': video['status']['madeForKids'],
-                          'view_count': video['statistics']['viewCount'],
-                          'likes': video['statistics']['likeCount'],
-                          'dislikes': video['statistics']['dislikeCount']}
-
-                if 'tags' in video['snippet']:
-                    kwargs['tags'] = list(set(tag.lower() for tag in video['snippet']['tags']))
-                else:
-                    kwargs['tags'] = []
-                if 'commentCount' in video['statistics']:
-                    kwargs['comment_count'] = video['statistics']['commentCount']
-                else:
-                    kwargs['comment_count'] = 0
-
-                self._videos.append(Video(**kwargs))
+                kwargs['comment_count'] = 0
+
+            self._videos.append(Video(**kwargs))
 
     def combine_titles(self, split=False, combine=False, stop_words=False):
         """ Combines the titles from multiple YouTube videos.
@@ -340,12 +430,13 @@ class Trending:
         the titles (default is False).
         """
 
-        for vid in self._videos:
-            if split:
-                vid.split_title(combine=combine)
-            if stop_words:
-                vid.stop_title()
-            self._titles.extend(vid.title)
+        if split or stop_words:
+            for vid in self._videos:
+                if split:
+                    vid.split_title(combine=combine)
+                if stop_words:
+                    vid.stop_title()
+        self._titles.extend(chain.from_iterable(vid.title for vid in self._videos))
 
     def combine_tags(self, split=False, combine=False, stop_words=False):
         """ Combines the tags from multiple YouTube videos.
@@ -358,12 +449,15 @@ class Trending:
         (default is False).
         """
 
-        for vid in [vid for vid in self._videos if vid.tags]:
-            if split:
-                vid.split_tags(combine=combine)
-            if stop_words:
-                vid.stop_tags()
-            self._tags.extend(vid.tags)
+        if split or stop_words:
+            for vid in self._videos:
+                if not vid.tags:
+                    continue
+                if split:
+                    vid.split_tags(combine=combine)
+                if stop_words:
+                    vid.stop_tags()
+        self._tags.extend(chain.from_iterable(vid.tags for vid in self._videos if vid.tags))
 
     def combine(self, split=False, combine=False, stop_words=False):
         """ Combines the titles together and the tags together from multiple YouTube videos.
@@ -376,15 +470,20 @@ class Trending:
         titles and the tags (default is False).
         """
 
+        # A single pass over the videos; Videos without tags are skipped for the tags, as in combine_tags
+        titles_extend, tags_extend = self._titles.extend, self._tags.extend
         for vid in self._videos:
+            has_tags = bool(vid.tags)
             if split:
                 vid.split_title(combine=combine)
-                vid.split_tags(combine=combine)
+                if has_tags:
+                    vid.split_tags(combine=combine)
             if stop_words:
                 vid.stop_title()
-                vid.stop_tags()
-            self._titles.extend(vid.title)
-            self._tags.extend(vid.tags)
+                if has_tags:
+                    vid.stop_tags()
+            titles_extend(vid.title)
+            tags_extend(vid.tags or ())
 
     def count(self, title=False, tag=False, name=None, index=None):
         """ Finds the number of times that a word from the title or a tag appears in self.titles or self.tags.
@@ -417,9 +516,7 @@ class Trending:
         :return: (dict) A dictionary of tags and frequencies {tag: frequency}.
         """
 
-        title_frequencies = {title: self._titles.count(title) for title in self._titles
-                             if self._titles.count(title) >= threshold}
-        self._title_frequencies = dict(sorted(title_frequencies.items(), key=lambda kv: kv[1]))
+        self._title_frequencies = self.__sort_frequencies(Counter(self._titles), threshold)
 
     def find_tag_frequencies(self, threshold=1):
         """ Finds the number of times that each tag element appears in self.tags if that value is above
@@ -429,8 +526,23 @@ class Trending:
         :return: (dict) A dictionary of tags and frequencies {tag: frequency}.
         """
 
-        tag_frequencies = {tag: self._tags.count(tag) for tag in self._tags if self._tags.count(tag) >= threshold}
-        self._tag_frequencies = dict(sorted(tag_frequencies.items(), key=lambda kv: kv[1]))
+        self._tag_frequencies = self.__sort_frequencies(Counter(self._tags), threshold)
+
+    @staticmethod
+    def __sort_frequencies(counter, threshold):
+        """ Keeps the elements that appear at least threshold times and sorts them by their frequency.
+
+        :param counter: (Counter) The number of times each element appears.
+        :param threshold: (int) The frequency threshold value.
+        :return: (dict) A dictionary of elements and frequencies sorted in ascending order {element: frequency}.
+        """
+
+        keys = np.array(list(counter.keys()), dtype=object)
+        vals = np.fromiter(counter.values(), dtype=np.int64, count=len(counter))
+        mask = vals >= threshold
+        keys, vals = keys[mask], vals[mask]
+        order = np.argsort(vals, kind='stable')
+        return dict(zip(keys[order].tolist(), vals[order].tolist()))
 
     def bar_plot(self, title=False, tag=False, threshold=1):
         """ A bar plot for the tag/title frequencies within the YouTube trending page.
@@ -441,17 +553,19 @@ class Trending:
         been found yet (default is 1).
         """
 
+        import matplotlib.pyplot as plt
+
         if title:
             if len(self._title_frequencies) == 0:
                 self.find_title_frequencies(threshold=threshold)
             keys = self._title_frequencies.keys()
-            vals = self._title_frequencies.values()
+            vals = np.fromiter(self._title_frequencies.values(), dtype=np.int64)
             plot_title = 'Frequency of Words from YouTube Video Titles on the Trending Page'
         elif tag:
             if len(self._tag_frequencies) == 0:
                 self.find_tag_frequencies(threshold=threshold)
             keys = self._tag_frequencies.keys()
-            vals = self._tag_frequencies.values()
+            vals = np.fromiter(self._tag_frequencies.values(), dtype=np.int64)
             plot_title = 'Frequency of a Given Tag on the YouTube Trending Page'
         else:
             return None
@@ -467,7 +581,7 @@ class Trending:
         ax.set_title(plot_title + f'\n{date} UTC', fontweight='bold')
         ax.xaxis.grid()
         ax.set_axisbelow(True)
-        plt.xticks(range(max(vals) + 2))
+        plt.xticks(range(vals.max() + 2))
         ax.yaxis.set_visible(False)
         plt.show()
 